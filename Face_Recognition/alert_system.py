@@ -2,6 +2,7 @@ import os
 import json
 import time
 import smtplib
+from functools import lru_cache
 from email.message import EmailMessage
 
 # === Config loading helpers ===
@@ -10,28 +11,34 @@ def load_json(path):
         return json.load(f)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-EMAIL_CFG = load_json(os.path.join(BASE_DIR,"Config", "email_config.json"))
+
+@lru_cache(maxsize=None)
+def get_email_config():
+    """Read email_config.json on first use rather than at import time."""
+    return load_json(os.path.join(BASE_DIR,"Config", "email_config.json"))
 
 # === Email alert ===
 def send_email_alert(subject: str, body: str, image_path: str):
     """Send an email with an attached image. Uses SMTP over SSL (port 465)."""
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_CFG["sender_email"]
-    msg["To"] = EMAIL_CFG["receiver_email"]
-    msg.set_content(body)
-
-    # Attach image
-    if image_path and os.path.exists(image_path):
-        with open(image_path, "rb") as img:
-            img_data = img.read()
-        maintype = "image"
-        subtype = os.path.splitext(image_path)[1].replace(".", "").lower() or "jpeg"
-        msg.add_attachment(img_data, maintype=maintype, subtype=subtype, filename=os.path.basename(image_path))
-
     try:
-        with smtplib.SMTP_SSL(EMAIL_CFG["smtp_server"], EMAIL_CFG["smtp_port"]) as server:
-            server.login(EMAIL_CFG["sender_email"], EMAIL_CFG["sender_password"])
+        # A missing or broken config must not take the monitor down with it
+        email_cfg = get_email_config()
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = email_cfg["sender_email"]
+        msg["To"] = email_cfg["receiver_email"]
+        msg.set_content(body)
+
+        # Attach image
+        if image_path and os.path.exists(image_path):
+            with open(image_path, "rb") as img:
+                img_data = img.read()
+            maintype = "image"
+            subtype = os.path.splitext(image_path)[1].replace(".", "").lower() or "jpeg"
+            msg.add_attachment(img_data, maintype=maintype, subtype=subtype, filename=os.path.basename(image_path))
+
+        with smtplib.SMTP_SSL(email_cfg["smtp_server"], email_cfg["smtp_port"]) as server:
+            server.login(email_cfg["sender_email"], email_cfg["sender_password"])
             server.send_message(msg)
         print("[INFO] Email alert sent.")
         return True
@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import numpy as np
+from collections import namedtuple
+from multiprocessing import shared_memory, resource_tracker
+
+# Small, picklable hand-off record — this is all that crosses process boundaries
+FrameDescriptor = namedtuple("FrameDescriptor", ["slot", "seq", "timestamp", "camera"])
+
+# Per-slot header columns
+_SEQ = 0
+_BUSY = 1
+
+
+class FrameBus:
+    """
+    Ring buffer of fixed-size frames in shared memory.
+
+    The capture process publishes each frame once into a free slot and hands a
+    FrameDescriptor to the detectors; detectors attach to the same block by name
+    and read the slot through a NumPy view, so frames are never pickled.
+    A slot stays busy until the descriptor is released, then it is reused;
+    the writer skips busy slots, so one slow reader never stalls the ring.
+    """
+
+    def __init__(self, shape, slots=8, dtype=np.uint8, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self._owner = name is None
+
+        header_bytes = slots * 2 * np.dtype(np.int64).itemsize
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+        elif sys.version_info >= (3, 13):
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Older Pythons track attached blocks too, so a reader's tracker would
+            # unlink the owner's block when that reader exits
+            if os.name == "posix":
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._header = np.ndarray((slots, 2), dtype=np.int64, buffer=self._shm.buf)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self._shm.buf, offset=header_bytes)
+        if self._owner:
+            self._header[:, _SEQ] = -1
+            self._header[:, _BUSY] = 0
+        self._next_seq = 0
+        self._next_slot = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def spec(self):
+        """Everything another process needs to attach to this bus."""
+        return {"name": self.name, "shape": self.shape, "slots": self.slots, "dtype": self.dtype.str}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], slots=spec["slots"], dtype=spec["dtype"], name=spec["name"])
+
+    def publish(self, frame, camera=0):
+        """
+        Copy frame into the next free slot and return its descriptor.
+        Returns None (frame dropped) if every slot is still held by a reader.
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match bus shape {self.shape}")
+
+        for i in range(self.slots):
+            slot = (self._next_slot + i) % self.slots
+            if not self._header[slot, _BUSY]:
+                break
+        else:
+            return None
+
+        seq = self._next_seq
+        self._frames[slot] = frame
+        self._header[slot, _SEQ] = seq
+        self._header[slot, _BUSY] = 1
+        self._next_seq += 1
+        self._next_slot = (slot + 1) % self.slots
+        return FrameDescriptor(slot, seq, time.time(), camera)
+
+    def view(self, desc):
+        """Read-only view of the frame behind desc, or None if the slot was reused."""
+        if self._header[desc.slot, _SEQ] != desc.seq:
+            return None
+        frame = self._frames[desc.slot]
+        frame.flags.writeable = False
+        return frame
+
+    def release(self, desc):
+        """Hand the slot back to the writer once nobody needs the frame anymore."""
+        if self._header[desc.slot, _SEQ] == desc.seq:
+            self._header[desc.slot, _BUSY] = 0
+
+    def close(self):
+        # Views must be dropped before the mapping can be closed
+        self._header = None
+        self._frames = None
+        self._shm.close()
+
+    def unlink(self):
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
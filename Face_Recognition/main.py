@@ -1,29 +1,31 @@
-import os, json, cv2, numpy as np, face_recognition
+import os, time, queue, cv2, numpy as np
+import multiprocessing as mp
 from alert_system import AlertManager
 from db_manager import init_db,log_event
-from utils import enhance_low_light,snapshots_dir
+from utils import enhance_low_light,snapshots_dir,load_gallery
+from frame_bus import FrameBus
 
 #Paths
 ENCODINGS_FILE=os.path.abspath(os.path.join(os.path.dirname(__file__),"..","Encoding","encodings.json"))
 
-#load encodings
-with open(ENCODINGS_FILE, "r") as f:
-    data=json.load(f)
-known_names=data["names"]
-known_encodings=[np.array(e) for e in data["encodings"]]
-
-#init db
-init_db()
-alert_mgr=AlertManager(cooldown_seconds=60)
-
 # Performance optimization settings
 FRAME_SKIP = 2  # Process every 2nd frame
 SNAPSHOT_CONFIDENCE_THRESHOLD = 0.8  # Only save snapshots for high confidence matches
 PROCESSING_SCALE = 0.25  # Scale factor for processing
-frame_count = 0
+MIN_CONFIDENCE_THRESHOLD = 0.3  # Minimum confidence to declare a match
 
-# Store last detected faces for persistent display
-last_detected_faces = []
+# Multi-process detection settings
+CAMERA_INDEX = 0
+NUM_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Leave one core for capture/display
+BUS_SLOTS = NUM_WORKERS * 2 + 2  # One in flight + one queued per worker, plus headroom
+DETECTION_TIMEOUT = 5.0  # Seconds before a slot held by an unanswered frame is reclaimed
+
+def warm_up():
+    """Load the dlib models and run the detector and encoder once so the first real frame isn't slow"""
+    import face_recognition
+    dummy = np.zeros((64, 64, 3), dtype=np.uint8)
+    face_recognition.face_locations(dummy)
+    face_recognition.face_encodings(dummy, known_face_locations=[(0, 64, 64, 0)])
 
 def draw_persistent_faces(frame, faces_list):
     """Draw stored face boxes and labels on the frame"""
@@ -37,37 +39,12 @@ def draw_persistent_faces(frame, faces_list):
         if name != "Unknown" and confidence > 0:
             cv2.putText(frame, f"{confidence:.2f}", (left, top-30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
 
-cap=cv2.VideoCapture(0)
-if not cap.isOpened():
-    raise RuntimeError("Camera not accessible")
-
-print("[INFO] Starting optimized face recognition...")
-print("[INFO] Processing every {} frame(s) for better performance".format(FRAME_SKIP + 1))
-
-while True:
-    ok,frame=cap.read()
-    if not ok:
-        print("[ERROR] Frame grab failed")
-        break
-
-    frame_count += 1
-
-    # Skip frames for better performance
-    if frame_count % (FRAME_SKIP + 1) != 0:
-        # Draw persistent faces from last processed frame
-        if last_detected_faces:
-            draw_persistent_faces(frame, last_detected_faces)
-
-        # Display frame with FPS info
-        fps_text = f"FPS: {cap.get(cv2.CAP_PROP_FPS):.1f} | Frame: {frame_count}"
-        cv2.putText(frame, fps_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.imshow("Smart webcam alert (phase 5)", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-        continue
+def recognize_faces(frame, seq, known_names, known_encodings):
+    """Detect and identify faces in a full-size BGR frame, returning boxes in frame coordinates"""
+    import face_recognition
 
     # Only apply enhancement when needed (every few frames)
-    if frame_count % 10 == 0:  # Check lighting every 10 processed frames
+    if seq % 10 == 0:  # Check lighting every 10 processed frames
         enhanced=enhance_low_light(frame)
     else:
         enhanced = frame
@@ -78,66 +55,93 @@ while True:
 
     # Detect faces
     locs = face_recognition.face_locations(rgb_small)
+    faces = []
 
     # Only compute encodings if faces are detected
-    if locs:
-        encs=face_recognition.face_encodings(rgb_small,locs)
-
-        # Clear previous faces and store new ones
-        last_detected_faces.clear()
-
-        for(face_top, face_right, face_bottom, face_left), enc in zip(locs, encs):
-            # Batch face comparison for better performance
-            matches = face_recognition.compare_faces(known_encodings, enc, tolerance=0.4)  # Lower tolerance for better accuracy
-            face_distances = face_recognition.face_distance(known_encodings, enc)
-
-            name = "Unknown"
-            confidence = 0.0
-            MIN_CONFIDENCE_THRESHOLD = 0.3  # Minimum confidence to declare a match
-
-            if True in matches:
-                best_match_index = matches.index(True)
-                confidence = 1.0 - face_distances[best_match_index]
-
-                # Only declare a match if confidence is above threshold
-                if confidence > MIN_CONFIDENCE_THRESHOLD:
-                    name = known_names[best_match_index]
-                else:
-                    name = "Unknown"
-                    confidence = 0.0
-
-            # Scale coordinates back to original size
-            # face_recognition returns (top, right, bottom, left) format
-            orig_top = int(face_top * (1/PROCESSING_SCALE))
-            orig_right = int(face_right * (1/PROCESSING_SCALE))
-            orig_bottom = int(face_bottom * (1/PROCESSING_SCALE))
-            orig_left = int(face_left * (1/PROCESSING_SCALE))
-
-            # Store face info for persistent display
-            last_detected_faces.append((orig_left, orig_top, orig_right, orig_bottom, name, confidence))
-
-            # Choose color based on recognition
-            if name != "Unknown":
-                color = (0, 255, 0)  # Green for known faces
-            else:
-                color = (0, 0, 255)  # Red for unknown faces
+    if not locs:
+        return faces
+    encs=face_recognition.face_encodings(rgb_small,locs)
 
-            # Draw rectangle on enhanced frame
-            cv2.rectangle(enhanced, (orig_left, orig_top), (orig_right, orig_bottom), color, 2)
-            cv2.putText(enhanced, name, (orig_left, orig_top-10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    for(face_top, face_right, face_bottom, face_left), enc in zip(locs, encs):
+        # Batch face comparison for better performance
+        matches = face_recognition.compare_faces(known_encodings, enc, tolerance=0.4)  # Lower tolerance for better accuracy
+        face_distances = face_recognition.face_distance(known_encodings, enc)
 
-            # Add confidence display for known faces
-            if name != "Unknown" and confidence > 0:
-                cv2.putText(enhanced, f"{confidence:.2f}", (orig_left, orig_top-30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+        name = "Unknown"
+        confidence = 0.0
 
-            # Save snapshots for every detected face
-            snaps = snapshots_dir()
-            face_crop = frame[orig_top:orig_bottom, orig_left:orig_right]
-            snap_path = None
+        if True in matches:
+            best_match_index = matches.index(True)
+            confidence = 1.0 - face_distances[best_match_index]
 
+            # Only declare a match if confidence is above threshold
+            if confidence > MIN_CONFIDENCE_THRESHOLD:
+                name = known_names[best_match_index]
+            else:
+                name = "Unknown"
+                confidence = 0.0
+
+        # Scale coordinates back to original size
+        # face_recognition returns (top, right, bottom, left) format
+        orig_top = int(face_top * (1/PROCESSING_SCALE))
+        orig_right = int(face_right * (1/PROCESSING_SCALE))
+        orig_bottom = int(face_bottom * (1/PROCESSING_SCALE))
+        orig_left = int(face_left * (1/PROCESSING_SCALE))
+
+        faces.append((orig_left, orig_top, orig_right, orig_bottom, name, float(confidence)))
+
+    return faces
+
+def detection_worker(known_names, known_encodings, spec_queue, tasks, results, ready):
+    """
+    Detector process: reads frames straight out of the shared-memory bus and
+    sends back only the descriptor plus the (small) list of recognized faces.
+    Models are loaded while the capture side is still opening the camera.
+    """
+    warm_up()
+
+    # Wait until capture has sized the bus, then pass the spec on to the next worker
+    bus_spec = spec_queue.get()
+    spec_queue.put(bus_spec)
+    if bus_spec is None:
+        return
+
+    bus = FrameBus.attach(bus_spec)
+    with ready.get_lock():
+        ready.value += 1
+    try:
+        while True:
+            desc = tasks.get()
+            if desc is None:
+                break
+            # Always answer, even on failure, so capture can release the slot
+            faces = []
+            try:
+                frame = bus.view(desc)
+                if frame is not None:
+                    faces = recognize_faces(frame, desc.seq, known_names, known_encodings)
+            except Exception as e:
+                print("[ERROR] Detection failed on frame {}: {}".format(desc.seq, e))
+            frame = None
+            results.put((desc, faces))
+    finally:
+        bus.close()
+
+def handle_detections(bus, desc, faces, alert_mgr):
+    """Save snapshots, log events and send alerts for one processed frame, then free its slot"""
+    frame = face_crop = None
+    try:
+        frame = bus.view(desc)
+        if frame is None:
+            return
+
+        snaps = snapshots_dir()
+        for left, top, right, bottom, name, confidence in faces:
             # Save snapshot for every detected face
+            face_crop = frame[top:bottom, left:right]
+            snap_path = None
             if face_crop.size > 0:
-                snap_path = os.path.join(snaps, f"{name}_{orig_top}_{orig_right}_{frame_count}.jpg")
+                snap_path = os.path.join(snaps, f"{name}_{top}_{right}_{desc.seq}.jpg")
                 cv2.imwrite(snap_path, face_crop)
 
             # Log events and send alerts
@@ -146,15 +150,127 @@ while True:
                 alert_mgr.alert_unknown(frame)
             else:
                 log_event(name, "known", snap_path)
-
-    # Display frame with FPS info
-    fps_text = f"FPS: {cap.get(cv2.CAP_PROP_FPS):.1f} | Frame: {frame_count}"
-    cv2.putText(enhanced, fps_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-    cv2.imshow("Smart webcam alert (phase 5)", enhanced)
-
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-cap.release()
-cv2.destroyAllWindows()
-print("[INFO] Face recognition system stopped.")
+    finally:
+        frame = face_crop = None
+        bus.release(desc)
+
+def start_worker(worker_args):
+    w = mp.Process(target=detection_worker, args=worker_args, daemon=True)
+    w.start()
+    return w
+
+def restart_dead_workers(workers, worker_args):
+    """Replace any detector process that has died so detection and alerts keep running"""
+    for i, w in enumerate(workers):
+        if not w.is_alive():
+            print("[WARNING] Detection worker {} exited with code {}; restarting".format(w.pid, w.exitcode))
+            workers[i] = start_worker(worker_args)
+
+def expire_pending(bus, pending):
+    """Release slots whose frames never got an answer, e.g. because their worker died"""
+    now = time.time()
+    for seq, desc in list(pending.items()):
+        if now - desc.timestamp > DETECTION_TIMEOUT:
+            print("[WARNING] No detection result for frame {}; releasing its slot".format(seq))
+            bus.release(desc)
+            del pending[seq]
+
+def main():
+    print("[INFO] Starting optimized face recognition...")
+    print("[INFO] Processing every {} frame(s) for better performance".format(FRAME_SKIP + 1))
+    print("[INFO] Using {} detection worker(s)".format(NUM_WORKERS))
+
+    # Parse the gallery once here; workers receive the arrays instead of each re-reading the file
+    known_names, known_encodings = load_gallery(ENCODINGS_FILE)
+
+    # Start the workers first so model loading and warm-up overlap with camera start-up
+    spec_queue, tasks, results = mp.Queue(), mp.Queue(), mp.Queue()
+    ready = mp.Value("i", 0)  # Number of workers warmed up and attached to the bus
+    worker_args = (known_names, known_encodings, spec_queue, tasks, results, ready)
+    workers = [start_worker(worker_args) for _ in range(NUM_WORKERS)]
+
+    #init db
+    init_db()
+    alert_mgr=AlertManager(cooldown_seconds=60)
+
+    bus = None
+    cap=cv2.VideoCapture(CAMERA_INDEX)
+    frame_count = 0
+    last_seq = -1
+    pending = {}  # seq -> descriptor of frames handed to the detectors
+
+    # Store last detected faces for persistent display
+    last_detected_faces = []
+
+    try:
+        if not cap.isOpened():
+            raise RuntimeError("Camera not accessible")
+
+        while True:
+            ok,frame=cap.read()
+            if not ok:
+                print("[ERROR] Frame grab failed")
+                break
+
+            # The bus is sized from the first frame the camera delivers
+            if bus is None:
+                bus = FrameBus(frame.shape, slots=BUS_SLOTS, dtype=frame.dtype)
+                spec_queue.put(bus.spec())
+
+            frame_count += 1
+            restart_dead_workers(workers, worker_args)
+            expire_pending(bus, pending)
+
+            # Hand every (FRAME_SKIP + 1)th frame to the detectors once one is ready,
+            # so frames don't pile up during warm-up; drop it if the ring is full
+            if frame_count % (FRAME_SKIP + 1) == 0 and ready.value > 0:
+                desc = bus.publish(frame, CAMERA_INDEX)
+                if desc is not None:
+                    pending[desc.seq] = desc
+                    tasks.put(desc)
+
+            # Collect whatever the detectors have finished
+            while True:
+                try:
+                    desc, faces = results.get_nowait()
+                except queue.Empty:
+                    break
+                pending.pop(desc.seq, None)
+                handle_detections(bus, desc, faces, alert_mgr)
+                # Results can arrive out of order; only newer frames with faces replace the overlay
+                if faces and desc.seq > last_seq:
+                    last_seq = desc.seq
+                    last_detected_faces = faces
+
+            # Draw persistent faces from last processed frame
+            if last_detected_faces:
+                draw_persistent_faces(frame, last_detected_faces)
+
+            # Display frame with FPS info
+            fps_text = f"FPS: {cap.get(cv2.CAP_PROP_FPS):.1f} | Frame: {frame_count}"
+            cv2.putText(frame, fps_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            cv2.imshow("Smart webcam alert (phase 5)", frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    except BaseException:
+        # Don't wait for workers that may still be loading models
+        for w in workers:
+            w.terminate()
+        raise
+    finally:
+        if bus is None:
+            spec_queue.put(None)
+        for _ in workers:
+            tasks.put(None)
+        for w in workers:
+            w.join(timeout=5)
+        cap.release()
+        cv2.destroyAllWindows()
+        if bus is not None:
+            bus.close()
+            bus.unlink()
+        print("[INFO] Face recognition system stopped.")
+
+if __name__ == "__main__":
+    main()
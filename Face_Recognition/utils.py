@@ -1,4 +1,4 @@
-import cv2,numpy as np, os
+import cv2,numpy as np, os, json
 
 BASE_DIR=os.path.dirname(os.path.abspath(__file__))
 
@@ -15,4 +15,21 @@ def enhance_low_light(img):
 def snapshots_dir():
     path=os.path.abspath(os.path.join(BASE_DIR,"..","alerts","snapshots"))
     os.makedirs(path,exist_ok=True)
-    return path
\ No newline at end of file
+    return path
+
+def load_gallery(json_path):
+    """
+    Return (names, encodings) for the known-face gallery.
+    Entries stored as per-person lists of encodings (as web_app.py writes them)
+    are flattened, repeating the name for each encoding.
+    """
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    names, encodings = [], []
+    for name, enc in zip(data["names"], data["encodings"]):
+        person_encs = enc if enc and isinstance(enc[0], list) else [enc]
+        for e in person_encs:
+            names.append(name)
+            encodings.append(e)
+    return names, np.array(encodings, dtype=np.float64).reshape(len(names), 128)
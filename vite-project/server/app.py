@@ -1,8 +1,6 @@
 from flask import Flask, jsonify, request, send_from_directory
-import sqlite3, os, pandas as pd, shutil, json
+import sqlite3, os, shutil, json, threading
 from flask_cors import CORS
-import face_recognition, cv2
-import numpy as np
 
 app = Flask(__name__)
 CORS(app)
@@ -48,6 +46,9 @@ def add_encoding_for_image(image_path, name):
         return False
 
     try:
+        # Heavy imports are deferred so the server (and each reloader spawn) starts fast
+        import face_recognition, cv2
+
         image = cv2.imread(image_path)
         rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         boxes = face_recognition.face_locations(rgb, model="hog")
@@ -70,6 +71,19 @@ def add_encoding_for_image(image_path, name):
         return False
 
 
+def warm_up():
+    """Load the dlib models and run the detector and encoder once so the first enrolment isn't slow."""
+    try:
+        import face_recognition, numpy as np
+
+        dummy = np.zeros((64, 64, 3), dtype=np.uint8)
+        face_recognition.face_locations(dummy)
+        face_recognition.face_encodings(dummy, known_face_locations=[(0, 64, 64, 0)])
+        print("🔥 Face models warmed up")
+    except Exception as e:
+        print(f"⚠️ Warm-up failed: {e}")
+
+
 # === DATABASE UTIL ===
 def fetch_logs():
     """Read intruder logs and attach snapshot URLs."""
@@ -77,22 +91,24 @@ def fetch_logs():
         raise FileNotFoundError(f"Database not found at {DB_FILE}")
 
     conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query("SELECT * FROM logs ORDER BY timestamp DESC", conn)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute("SELECT * FROM logs ORDER BY timestamp DESC")]
     conn.close()
 
-    df["snapshot_url"] = df["snapshot"].apply(
-        lambda x: f"http://127.0.0.1:5000/snapshots/{os.path.basename(x)}"
-        if x and os.path.exists(x)
-        else None
-    )
-    return df
+    for row in rows:
+        x = row["snapshot"]
+        row["snapshot_url"] = (
+            f"http://127.0.0.1:5000/snapshots/{os.path.basename(x)}"
+            if x and os.path.exists(x)
+            else None
+        )
+    return rows
 
 
 # === ROUTES ===
 @app.route("/api/logs", methods=["GET"])
 def get_logs():
-    df = fetch_logs()
-    return jsonify(df.to_dict(orient="records"))
+    return jsonify(fetch_logs())
 
 
 @app.route("/snapshots/<path:filename>")
@@ -188,4 +204,7 @@ def add_unknown():
 
 # === MAIN ===
 if __name__ == "__main__":
+    # With the debug reloader, only the child process that serves requests warms up
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        threading.Thread(target=warm_up, daemon=True).start()
     app.run(debug=True)